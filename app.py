@@ -1,4 +1,5 @@
 from flask import Flask, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 from flask_cors import CORS
 import os
 from config import Config
@@ -6,9 +7,29 @@ from controllers.database_controller import database_bp
 from controllers.backup_controller import backup_bp
 from controllers.user_controller import user_bp
 
+try:
+    import orjson
+except ImportError:  # Keep Flask's default json provider
+    orjson = None
+
+class OrjsonProvider(JSONProvider):
+    """Serialize API responses with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        # Types orjson does not know (e.g. Decimal) go through Flask's defaults
+        return orjson.dumps(obj, default=DefaultJSONProvider.default).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__, static_folder='static', static_url_path='')
 app.config.from_object(Config)
 CORS(app)
+if orjson:
+    app.json = OrjsonProvider(app)
+
+# Ensure backup directory exists (also when served through wsgi.py)
+os.makedirs(app.config['BACKUP_DIR'], exist_ok=True)
 
 # Register blueprints
 app.register_blueprint(database_bp, url_prefix='/api/databases')
@@ -32,6 +53,5 @@ def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
 if __name__ == '__main__':
-    # Ensure backup directory exists
-    os.makedirs(app.config['BACKUP_DIR'], exist_ok=True)
+    # Development server only; see wsgi.py for production
     app.run(debug=True, host='0.0.0.0', port=5000)
@@ -6,19 +6,25 @@ class Config:
     MYSQL_USER = 'root'
     MYSQL_PASSWORD = 'kelma'
     MYSQL_PORT = 3306
+    # Size of the shared connection pool (mysql-connector allows at most 32)
+    MYSQL_POOL_SIZE = int(os.environ.get('MYSQL_POOL_SIZE', 10))
+    MYSQL_POOL_TIMEOUT = 10  # seconds to wait for a free pooled connection
+    # The pure-Python driver uses Python sockets, which gevent can make cooperative
+    MYSQL_USE_PURE = os.environ.get('MYSQL_USE_PURE') == '1'
     
     # Backup Settings
     BACKUP_DIR = os.path.join(os.path.dirname(__file__), 'backups')
-    METADATA_FILE = os.path.join(BACKUP_DIR, 'backup_metadata.json')
+    METADATA_FILE = os.path.join(BACKUP_DIR, 'backup_metadata.jsonl')
+    LEGACY_METADATA_FILE = os.path.join(BACKUP_DIR, 'backup_metadata.json')
     RESTORE_STATS_FILE = os.path.join(BACKUP_DIR, 'restore_stats.json')
     
     # System Databases (protected from deletion)
-    SYSTEM_DATABASES = [
+    SYSTEM_DATABASES = frozenset([
         'information_schema',
         'mysql',
         'performance_schema',
         'sys'
-    ]
+    ])
     
     # Flask Settings
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
@@ -0,0 +1,75 @@
+import re
+from functools import wraps
+import msgspec
+import msgspec.structs
+from flask import jsonify, make_response, request
+
+# Read-only endpoints may be reused briefly by browsers and proxies
+CACHE_CONTROL = 'max-age=5, stale-while-revalidate=30'
+
+def is_fresh(etag):
+    """Whether the client already holds the representation with this ETag"""
+    return etag is not None and request.if_none_match.contains(etag)
+
+def not_modified(etag):
+    """Build a 304 response for a representation the client already has"""
+    response = make_response('', 304)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+def cacheable(response, etag=None):
+    """Add caching headers to a GET response, answering 304 if the client's copy is current"""
+    if etag:
+        response.set_etag(etag)
+    else:
+        response.add_etag()
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response.make_conditional(request)
+
+def api(view):
+    """Turn exceptions raised by a view into JSON error responses.
+
+    ValueError means the request itself was invalid (400); anything else
+    is reported as a server error (500).
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+    return wrapper
+
+def success_response(**fields):
+    """Build a {'success': True, ...} JSON response"""
+    return jsonify({'success': True, **fields})
+
+def parse_body(decoder, message=None):
+    """Decode and validate the JSON request body with a msgspec decoder.
+
+    The schemas keep required fields required, so a missing or null one
+    fails validation here; that failure is reported with the endpoint's
+    own ``message`` instead of msgspec's wording. Other invalid bodies get
+    msgspec's error text.
+    """
+    try:
+        return decoder.decode(request.get_data())
+    except msgspec.ValidationError as e:
+        if message and _required_field_error(decoder.type, str(e)):
+            raise ValueError(message)
+        raise ValueError(str(e))
+    except msgspec.DecodeError as e:
+        # The body is not JSON at all
+        raise ValueError(str(e))
+
+def _required_field_error(struct_type, error):
+    """Whether a ValidationError is about a missing or null required top-level field"""
+    match = (re.match(r'Object missing required field `([^`]+)`$', error)
+             or re.match(r'Expected `[^`]+`, got `null` - at `\$\.([^`.\[]+)`$', error))
+    if not match:
+        return False
+    return any(f.encode_name == match.group(1) and f.required
+               for f in msgspec.structs.fields(struct_type))
@@ -1,73 +1,113 @@
-from flask import Blueprint, jsonify, request
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+import msgspec
+from flask import Blueprint, jsonify
 from models.backup_model import BackupModel
+from controllers._util import api, cacheable, is_fresh, not_modified, parse_body, success_response
 
 backup_bp = Blueprint('backup', __name__)
 
+class BackupRequest(msgspec.Struct):
+    database: str
+    table: Optional[str] = None
+
+class RestoreRequest(msgspec.Struct):
+    filename: str
+    target_database: Optional[str] = None
+
+_backup_decoder = msgspec.json.Decoder(BackupRequest)
+_restore_decoder = msgspec.json.Decoder(RestoreRequest)
+
+# Backups and restores run off the request thread; clients poll /jobs/<id>
+EXECUTOR = ThreadPoolExecutor(max_workers=4)
+JOBS = {}
+_jobs_lock = threading.Lock()  # request threads share JOBS
+MAX_FINISHED_JOBS = 100  # finished jobs kept around for polling
+
+def _submit_job(fn):
+    """Run fn in the executor and return its job id"""
+    job_id = uuid.uuid4().hex
+    with _jobs_lock:
+        finished = [old_id for old_id, future in JOBS.items() if future.done()]
+        for old_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del JOBS[old_id]
+        JOBS[job_id] = EXECUTOR.submit(fn)
+    return job_id
+
+@backup_bp.route('/jobs/<job_id>', methods=['GET'])
+@api
+def get_job(job_id):
+    """Get the status of a backup or restore job"""
+    with _jobs_lock:
+        future = JOBS.get(job_id)
+    if future is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if not future.done():
+        return success_response(done=False)
+    
+    error = future.exception()
+    if error:
+        return jsonify({'success': False, 'done': True, 'error': str(error)})
+    return success_response(done=True, **future.result())
+
 @backup_bp.route('/metadata', methods=['GET'])
+@api
 def get_metadata():
     """Get all backup metadata"""
-    try:
-        metadata = BackupModel.get_metadata()
-        return jsonify({'success': True, 'backups': metadata})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    # The log's file version identifies the list without reading it
+    etag = BackupModel.metadata_etag()
+    if is_fresh(etag):
+        return not_modified(etag)
+    metadata = BackupModel.get_metadata()
+    return cacheable(success_response(backups=metadata), etag)
 
 @backup_bp.route('/stats', methods=['GET'])
+@api
 def get_stats():
     """Get backup statistics"""
-    try:
-        stats = BackupModel.get_backup_stats()
-        return jsonify({'success': True, 'stats': stats})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    stats = BackupModel.get_backup_stats()
+    return cacheable(success_response(stats=stats))
 
 @backup_bp.route('', methods=['POST'])
+@api
 def create_backup():
     """Create a new backup"""
-    try:
-        data = request.get_json()
-        database = data.get('database')
-        table = data.get('table')
-        
-        if not database:
-            return jsonify({'success': False, 'error': 'Database name is required'}), 400
-        
-        result = BackupModel.backup_database(database, table)
-        return jsonify({
-            'success': True, 
-            'message': 'Backup created successfully',
-            'backup': result
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    req = parse_body(_backup_decoder, 'Database name is required')
+    database = req.database
+    table = req.table
+    
+    if not database:
+        raise ValueError('Database name is required')
+    
+    job_id = _submit_job(lambda: {
+        'message': 'Backup created successfully',
+        'backup': BackupModel.backup_database(database, table)
+    })
+    return success_response(message='Backup started', job_id=job_id), 202
 
 @backup_bp.route('/restore', methods=['POST'])
+@api
 def restore_backup():
     """Restore from backup"""
-    try:
-        data = request.get_json()
-        filename = data.get('filename')
-        target_database = data.get('target_database')
-        
-        if not filename:
-            return jsonify({'success': False, 'error': 'Filename is required'}), 400
-        
+    req = parse_body(_restore_decoder, 'Filename is required')
+    filename = req.filename
+    target_database = req.target_database
+    
+    if not filename:
+        raise ValueError('Filename is required')
+    
+    def restore():
         BackupModel.restore_backup(filename, target_database)
-        return jsonify({
-            'success': True, 
-            'message': 'Database restored successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return {'message': 'Database restored successfully'}
+    
+    job_id = _submit_job(restore)
+    return success_response(message='Restore started', job_id=job_id), 202
 
 @backup_bp.route('/<filename>', methods=['DELETE'])
+@api
 def delete_backup(filename):
     """Delete a backup file"""
-    try:
-        BackupModel.delete_backup(filename)
-        return jsonify({
-            'success': True, 
-            'message': 'Backup deleted successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    BackupModel.delete_backup(filename)
+    return success_response(message='Backup deleted successfully')
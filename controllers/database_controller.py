@@ -1,80 +1,82 @@
-from flask import Blueprint, jsonify, request
+import msgspec
+from flask import Blueprint
 from models.database_model import DatabaseModel
+from controllers._util import api, cacheable, parse_body, success_response
 
 database_bp = Blueprint('database', __name__)
 
+class CreateDatabaseRequest(msgspec.Struct):
+    name: str
+
+class Column(msgspec.Struct):
+    name: str
+    type: str
+
+class CreateTableRequest(msgspec.Struct):
+    name: str
+    columns: list[Column]
+
+_create_database_decoder = msgspec.json.Decoder(CreateDatabaseRequest)
+_create_table_decoder = msgspec.json.Decoder(CreateTableRequest)
+
 @database_bp.route('', methods=['GET'])
+@api
 def get_databases():
     """Get all databases"""
-    try:
-        databases = DatabaseModel.get_all_databases()
-        return jsonify({'success': True, 'databases': databases})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    databases = DatabaseModel.get_all_databases()
+    return cacheable(success_response(databases=databases))
 
 @database_bp.route('', methods=['POST'])
+@api
 def create_database():
     """Create a new database"""
-    try:
-        data = request.get_json()
-        database_name = data.get('name')
-        
-        if not database_name:
-            return jsonify({'success': False, 'error': 'Database name is required'}), 400
-        
-        DatabaseModel.create_database(database_name)
-        return jsonify({'success': True, 'message': f'Database {database_name} created successfully'})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    req = parse_body(_create_database_decoder, 'Database name is required')
+    database_name = req.name
+    
+    if not database_name:
+        raise ValueError('Database name is required')
+    
+    DatabaseModel.create_database(database_name)
+    return success_response(message=f'Database {database_name} created successfully')
 
 @database_bp.route('/<database_name>', methods=['DELETE'])
+@api
 def drop_database(database_name):
     """Drop a database"""
-    try:
-        DatabaseModel.drop_database(database_name)
-        return jsonify({'success': True, 'message': f'Database {database_name} dropped successfully'})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    DatabaseModel.drop_database(database_name)
+    return success_response(message=f'Database {database_name} dropped successfully')
 
 @database_bp.route('/<database_name>/tables', methods=['GET'])
+@api
 def get_tables(database_name):
     """Get all tables in a database"""
-    try:
-        tables = DatabaseModel.get_tables(database_name)
-        return jsonify({'success': True, 'tables': tables})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    tables = DatabaseModel.get_tables(database_name)
+    return cacheable(success_response(tables=tables))
 
 @database_bp.route('/<database_name>/tables', methods=['POST'])
+@api
 def create_table(database_name):
     """Create a new table"""
-    try:
-        data = request.get_json()
-        table_name = data.get('name')
-        columns = data.get('columns')
-        
-        if not table_name or not columns:
-            return jsonify({'success': False, 'error': 'Table name and columns are required'}), 400
-        
-        DatabaseModel.create_table(database_name, table_name, columns)
-        return jsonify({'success': True, 'message': f'Table {table_name} created successfully'})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    req = parse_body(_create_table_decoder, 'Table name and columns are required')
+    table_name = req.name
+    columns = req.columns
+    
+    if not table_name or not columns:
+        raise ValueError('Table name and columns are required')
+    
+    DatabaseModel.create_table(database_name, table_name, msgspec.to_builtins(columns))
+    return success_response(message=f'Table {table_name} created successfully')
 
 @database_bp.route('/<database_name>/tables/<table_name>', methods=['DELETE'])
+@api
 def drop_table(database_name, table_name):
     """Drop a table"""
-    try:
-        DatabaseModel.drop_table(database_name, table_name)
-        return jsonify({'success': True, 'message': f'Table {table_name} dropped successfully'})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    DatabaseModel.drop_table(database_name, table_name)
+    return success_response(message=f'Table {table_name} dropped successfully')
 
 @database_bp.route('/<database_name>/tables/<table_name>/structure', methods=['GET'])
+@api
 def get_table_structure(database_name, table_name):
     """Get table structure"""
-    try:
-        structure = DatabaseModel.get_table_structure(database_name, table_name)
-        return jsonify({'success': True, 'structure': structure})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    structure = DatabaseModel.get_table_structure(database_name, table_name)
+    return success_response(structure=structure)
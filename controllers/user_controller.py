@@ -1,96 +1,88 @@
-from flask import Blueprint, jsonify, request
+from typing import Optional
+import msgspec
+from flask import Blueprint, request
 from models.user_model import UserModel
+from controllers._util import api, parse_body, success_response
 
 user_bp = Blueprint('user', __name__)
 
+class CreateUserRequest(msgspec.Struct):
+    username: str
+    password: Optional[str] = None
+    host: str = 'localhost'
+
+class PrivilegesRequest(msgspec.Struct):
+    database: str
+    privileges: list[str]
+    host: str = 'localhost'
+
+_create_user_decoder = msgspec.json.Decoder(CreateUserRequest)
+_privileges_decoder = msgspec.json.Decoder(PrivilegesRequest)
+
 @user_bp.route('', methods=['GET'])
+@api
 def get_users():
     """Get all MySQL users"""
-    try:
-        users = UserModel.get_all_users()
-        return jsonify({'success': True, 'users': users})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    users = UserModel.get_all_users()
+    return success_response(users=users)
 
 @user_bp.route('', methods=['POST'])
+@api
 def create_user():
     """Create a new MySQL user"""
-    try:
-        data = request.get_json()
-        username = data.get('username')
-        password = data.get('password')  # Optional
-        host = data.get('host', 'localhost')
-        
-        if not username:
-            return jsonify({'success': False, 'error': 'Username is required'}), 400
-        
-        UserModel.create_user(username, password, host)
-        return jsonify({
-            'success': True, 
-            'message': f'User {username}@{host} created successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    req = parse_body(_create_user_decoder, 'Username is required')
+    username = req.username
+    password = req.password  # Optional
+    host = req.host
+    
+    if not username:
+        raise ValueError('Username is required')
+    
+    UserModel.create_user(username, password, host)
+    return success_response(message=f'User {username}@{host} created successfully')
 
 @user_bp.route('/<username>', methods=['DELETE'])
+@api
 def drop_user(username):
     """Drop a MySQL user"""
-    try:
-        host = request.args.get('host', 'localhost')
-        UserModel.drop_user(username, host)
-        return jsonify({
-            'success': True, 
-            'message': f'User {username}@{host} dropped successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    host = request.args.get('host', 'localhost')
+    UserModel.drop_user(username, host)
+    return success_response(message=f'User {username}@{host} dropped successfully')
 
 @user_bp.route('/<username>/privileges', methods=['GET'])
+@api
 def get_privileges(username):
     """Get user privileges"""
-    try:
-        host = request.args.get('host', 'localhost')
-        privileges = UserModel.get_user_privileges(username, host)
-        return jsonify({'success': True, 'privileges': privileges})
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    host = request.args.get('host', 'localhost')
+    privileges = UserModel.get_user_privileges(username, host)
+    return success_response(privileges=privileges)
 
 @user_bp.route('/<username>/privileges/grant', methods=['POST'])
+@api
 def grant_privileges(username):
     """Grant privileges to user"""
-    try:
-        data = request.get_json()
-        host = data.get('host', 'localhost')
-        database = data.get('database')
-        privileges = data.get('privileges')
-        
-        if not database or not privileges:
-            return jsonify({'success': False, 'error': 'Database and privileges are required'}), 400
-        
-        UserModel.grant_privileges(username, host, database, privileges)
-        return jsonify({
-            'success': True, 
-            'message': 'Privileges granted successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    req = parse_body(_privileges_decoder, 'Database and privileges are required')
+    host = req.host
+    database = req.database
+    privileges = req.privileges
+    
+    if not database or not privileges:
+        raise ValueError('Database and privileges are required')
+    
+    UserModel.grant_privileges(username, host, database, privileges)
+    return success_response(message='Privileges granted successfully')
 
 @user_bp.route('/<username>/privileges/revoke', methods=['POST'])
+@api
 def revoke_privileges(username):
     """Revoke privileges from user"""
-    try:
-        data = request.get_json()
-        host = data.get('host', 'localhost')
-        database = data.get('database')
-        privileges = data.get('privileges')
-        
-        if not database or not privileges:
-            return jsonify({'success': False, 'error': 'Database and privileges are required'}), 400
-        
-        UserModel.revoke_privileges(username, host, database, privileges)
-        return jsonify({
-            'success': True, 
-            'message': 'Privileges revoked successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    req = parse_body(_privileges_decoder, 'Database and privileges are required')
+    host = req.host
+    database = req.database
+    privileges = req.privileges
+    
+    if not database or not privileges:
+        raise ValueError('Database and privileges are required')
+    
+    UserModel.revoke_privileges(username, host, database, privileges)
+    return success_response(message='Privileges revoked successfully')
@@ -1,35 +1,298 @@
-import subprocess
+import io
 import os
+import gzip
+import atexit
 import json
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
 from config import Config
-from models.database_model import DatabaseModel
+from models.database_model import (DatabaseModel, SYSTEM_DATABASES,
+                                   SYSTEM_DATABASES_PLACEHOLDERS, quote_identifier)
+from mysql.connector import Error
 import time
 
+try:
+    import orjson
+except ImportError:  # Fall back to the standard library
+    orjson = None
+
 # Simple cache to avoid recomputing stats on every request
 _stats_cache = {'data': None, 'timestamp': 0}
 CACHE_DURATION = 5  # seconds
 
+# The information_schema table count is cached separately for longer
+_table_count_cache = {'count': 0, 'timestamp': float('-inf')}  # -inf: stale
+TABLE_COUNT_CACHE_DURATION = 30  # seconds
+
+# Built once; system database names are bound as parameters
+_TOTAL_TABLES_SQL = (
+    "SELECT COUNT(*) FROM information_schema.TABLES "
+    f"WHERE TABLE_SCHEMA NOT IN ({SYSTEM_DATABASES_PLACEHOLDERS}) "
+    "AND TABLE_TYPE = 'BASE TABLE'"
+)
+
+# Parsed metadata, reused until the file's mtime changes.
+# Metadata is kept as {filename: entry} in log order (oldest first).
+_metadata_cache = {'data': None, 'mtime': -1, 'lines': 0, 'summary': None}
+_metadata_lock = threading.RLock()
+_compacting = threading.Event()
+
+# Backup compression: level 3 keeps most of the size win at a fraction of the CPU
+GZIP_LEVEL = 3
+INSERT_BATCH = 500  # rows per multi-row INSERT in dumps
+_DUMP_COLUMNS_SQL = (
+    "SELECT COLUMN_NAME, DATA_TYPE, EXTRA FROM information_schema.COLUMNS "
+    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s ORDER BY ORDINAL_POSITION"
+)
+_DUMP_SESSION_SQL = "SET TIME_ZONE = '+00:00', SQL_MODE = 'NO_AUTO_VALUE_ON_ZERO'"
+_DATE_TYPES = frozenset(['date', 'datetime', 'timestamp'])
+_DUMP_TRIGGERS_SQL = (
+    "SELECT TRIGGER_NAME, EVENT_OBJECT_TABLE FROM information_schema.TRIGGERS "
+    "WHERE TRIGGER_SCHEMA = %s ORDER BY EVENT_OBJECT_TABLE, ACTION_ORDER"
+)
+
+# Restore count, kept in memory and written to disk at most every few seconds
+_restore_state = {'count': None, 'dirty': False, 'timer': None}
+_restore_lock = threading.RLock()
+RESTORE_FLUSH_DELAY = 2  # seconds
+
+# Rewrite the metadata log once tombstoned lines exceed this share of it
+COMPACT_RATIO = 0.25
+
+def _dumps(data, indent=False):
+    """Serialize data to JSON bytes"""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    if indent:
+        return json.dumps(data, indent=2).encode()
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def _loads(raw):
+    """Parse JSON bytes"""
+    return orjson.loads(raw) if orjson else json.loads(raw)
+
+def _load_json(path):
+    """Read and parse a JSON file"""
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+def _save_json(path, data):
+    """Serialize data to a JSON file with 2-space indentation"""
+    with open(path, 'wb') as f:
+        f.write(_dumps(data, indent=True))
+
+def _mtime(path):
+    """Return (mtime in nanoseconds, size) for a file, or None if it does not exist.
+
+    The size is included so that an append landing in the same mtime tick
+    still invalidates the cache.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+_SQL_ESCAPES = str.maketrans({
+    '\\': '\\\\', "'": "\\'", '\0': '\\0',
+    '\n': '\\n', '\r': '\\r', '\x1a': '\\Z'
+})
+
+def _sql_literal(value):
+    """Format a value fetched by mysql-connector as a SQL literal"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, (int, float, Decimal)):
+        return repr(value) if isinstance(value, float) else str(value)
+    if isinstance(value, (bytes, bytearray)):
+        return "X'" + value.hex() + "'" if value else "''"
+    if isinstance(value, timedelta):
+        # TIME columns come back as timedelta
+        seconds = int(abs(value).total_seconds())
+        sign = '-' if value < timedelta(0) else ''
+        text = f"{sign}{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+        if value.microseconds:
+            text += f".{abs(value).microseconds:06d}"
+        return f"'{text}'"
+    if isinstance(value, (set, frozenset)):
+        value = ','.join(sorted(value))
+    return "'" + str(value).translate(_SQL_ESCAPES) + "'"
+
+def _iter_statements(f):
+    """Yield SQL statements (as bytes) from a dump, one per delimiter-terminated line.
+
+    Understands the DELIMITER command and skips "--" comments, so files
+    written by mysqldump restore as well. Works on bytes because such dumps
+    may hold raw BLOB data that is not valid UTF-8.
+    """
+    delimiter = b';'
+    buf = []
+    for line in f:
+        stripped = line.strip()
+        if not buf:
+            if not stripped or stripped.startswith(b'--'):
+                continue
+            if stripped.upper().startswith(b'DELIMITER '):
+                delimiter = stripped.split(None, 1)[1]
+                continue
+        buf.append(line)
+        if stripped.endswith(delimiter):
+            statement = b''.join(buf).rstrip()[:-len(delimiter)]
+            buf = []
+            if statement.strip():
+                yield statement
+    if b''.join(buf).strip():
+        yield b''.join(buf)
+
+def _order_views(views):
+    """Order {name: CREATE VIEW sql} so that views come after the views they select from"""
+    ordered = []
+    pending = dict(views)
+    while pending:
+        ready = [name for name, sql in pending.items()
+                 if not any(quote_identifier(other) in sql.split(' AS ', 1)[-1]
+                            for other in pending if other != name)]
+        # MySQL rejects circular views, so this only guards against false matches
+        for name in ready or sorted(pending):
+            ordered.append((name, pending.pop(name)))
+    return ordered
+
+def _migrate_legacy_metadata():
+    """Convert the old single-document backup_metadata.json into the log format"""
+    legacy = Config.LEGACY_METADATA_FILE
+    if os.path.exists(Config.METADATA_FILE) or not os.path.exists(legacy):
+        return
+    metadata = _load_json(legacy)
+    BackupModel.save_metadata(metadata)
+    os.remove(legacy)
+
 class BackupModel:
     
+    @staticmethod
+    def _read_log():
+        """Fold the metadata log into {filename: entry}, returning it with the line count"""
+        entries = {}
+        lines = 0
+        with open(Config.METADATA_FILE, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                lines += 1
+                try:
+                    record = _loads(line)
+                    record['filename']
+                except (ValueError, KeyError, TypeError):
+                    # Torn write from a crash or full disk; compaction drops it
+                    continue
+                op = record.pop('op', 'add')
+                if op == 'del':
+                    entries.pop(record['filename'], None)
+                else:
+                    entries.pop(record['filename'], None)
+                    entries[record['filename']] = record
+        return entries, lines
+    
+    @staticmethod
+    def _append_log(record):
+        """Append one record to the metadata log and keep the cache in step"""
+        with _metadata_lock:
+            fresh = _metadata_cache['mtime'] == _mtime(Config.METADATA_FILE)
+            with open(Config.METADATA_FILE, 'a+b') as f:
+                line = _dumps(record) + b'\n'
+                # Start on a fresh line if a previous append was cut short
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        line = b'\n' + line
+                f.write(line)
+            if fresh:
+                entries = _metadata_cache['data']
+                record = dict(record)
+                if record.pop('op') == 'del':
+                    entries.pop(record['filename'], None)
+                else:
+                    entries.pop(record['filename'], None)
+                    entries[record['filename']] = record
+                _metadata_cache['lines'] += 1
+                _metadata_cache['summary'] = None
+                _metadata_cache['mtime'] = _mtime(Config.METADATA_FILE)
+    
+    @staticmethod
+    def _refresh_metadata():
+        """Return the cached {filename: entry} map, re-reading the log if it changed"""
+        with _metadata_lock:
+            mtime = _mtime(Config.METADATA_FILE)
+            if mtime is None:
+                return {}
+            if mtime != _metadata_cache['mtime']:
+                entries, lines = BackupModel._read_log()
+                _metadata_cache['data'] = entries
+                _metadata_cache['lines'] = lines
+                _metadata_cache['summary'] = None
+                _metadata_cache['mtime'] = mtime
+            return _metadata_cache['data']
+    
     @staticmethod
     def get_metadata():
-        """Load backup metadata from JSON file"""
-        if os.path.exists(Config.METADATA_FILE):
-            with open(Config.METADATA_FILE, 'r') as f:
-                return json.load(f)
-        return []
+        """Load backup metadata from the log file, most recent first (cached until the file changes)"""
+        with _metadata_lock:
+            return list(reversed(BackupModel._refresh_metadata().values()))
+    
+    @staticmethod
+    def metadata_etag():
+        """Return an ETag for the current metadata, or None if there is none yet"""
+        version = _mtime(Config.METADATA_FILE)
+        if version is None:
+            return None
+        return '%x-%x' % version
+    
+    @staticmethod
+    def _metadata_summary():
+        """Return (total backups, distinct databases backed up), cached with the metadata"""
+        with _metadata_lock:
+            entries = BackupModel._refresh_metadata()
+            if not entries:
+                return 0, 0
+            summary = _metadata_cache['summary']
+            if summary is None:
+                databases_backed_up = {entry['database'] for entry in entries.values()}
+                summary = (len(entries), len(databases_backed_up))
+                _metadata_cache['summary'] = summary
+            return summary
     
     @staticmethod
     def save_metadata(metadata):
-        """Save backup metadata to JSON file"""
-        with open(Config.METADATA_FILE, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        """Rewrite the metadata log with only the given entries (most recent first)"""
+        entries = {}
+        for entry in reversed(metadata):
+            entries[entry['filename']] = dict(entry)
+        tmp_path = Config.METADATA_FILE + '.tmp'
+        with _metadata_lock:
+            with open(tmp_path, 'wb') as f:
+                for entry in entries.values():
+                    f.write(_dumps({'op': 'add', **entry}) + b'\n')
+            os.replace(tmp_path, Config.METADATA_FILE)
+            _metadata_cache['data'] = entries
+            _metadata_cache['lines'] = len(entries)
+            _metadata_cache['summary'] = None
+            _metadata_cache['mtime'] = _mtime(Config.METADATA_FILE)
+    
+    @staticmethod
+    def compact_metadata():
+        """Drop tombstoned and superseded lines from the metadata log"""
+        try:
+            # Hold the lock across read and rewrite so no append is lost in between
+            with _metadata_lock:
+                BackupModel.save_metadata(BackupModel.get_metadata())
+        finally:
+            _compacting.clear()
     
     @staticmethod
     def add_backup_entry(database, table, filename, size):
         """Add a new backup entry to metadata"""
-        metadata = BackupModel.get_metadata()
         entry = {
             'filename': filename,
             'database': database,
@@ -37,81 +300,210 @@ class BackupModel:
             'timestamp': datetime.now().isoformat(),
             'size': size
         }
-        metadata.insert(0, entry)  # Add to beginning for recent first
-        BackupModel.save_metadata(metadata)
+        BackupModel._append_log({'op': 'add', **entry})
         return entry
     
     @staticmethod
     def remove_backup_entry(filename):
         """Remove backup entry from metadata"""
-        metadata = BackupModel.get_metadata()
-        metadata = [m for m in metadata if m['filename'] != filename]
-        BackupModel.save_metadata(metadata)
+        with _metadata_lock:
+            BackupModel._append_log({'op': 'del', 'filename': filename})
+            
+            # Compact in the background once dead lines make up too much of the log
+            live = len(BackupModel._refresh_metadata())
+            lines = _metadata_cache['lines']
+            if lines and (lines - live) / lines > COMPACT_RATIO and not _compacting.is_set():
+                _compacting.set()
+                threading.Thread(target=BackupModel.compact_metadata, daemon=True).start()
+    
+    @staticmethod
+    def _dump_columns(connection, database_name, table):
+        """Return (name, data type) of the columns to dump, in order, leaving out generated columns.
+
+        Listing them explicitly also picks up INVISIBLE columns, which
+        SELECT * leaves out.
+        """
+        cursor = connection.cursor()
+        cursor.execute(_DUMP_COLUMNS_SQL, (database_name, table))
+        columns = [(name, data_type.lower()) for name, data_type, extra in cursor.fetchall()
+                   if 'VIRTUAL GENERATED' not in extra.upper()
+                   and 'STORED GENERATED' not in extra.upper()]
+        cursor.close()
+        return columns
+    
+    @staticmethod
+    def _dump_stream(connection, database_name, table_name, out):
+        """Write tables with their rows, triggers and views for a database (or one table) to out.
+
+        On error the connection may hold an unread result; the caller must
+        not return it to the pool as it is.
+        """
+        # Same session settings on both ends: TIMESTAMPs are read and written
+        # in UTC, and a 0 in an AUTO_INCREMENT column stays 0 on restore
+        cursor = connection.cursor()
+        cursor.execute(_DUMP_SESSION_SQL)
+        cursor.close()
+        
+        out.write(f"-- Dump of `{database_name}` created {datetime.now().isoformat()}\n")
+        out.write(f"{_DUMP_SESSION_SQL};\n")
+        out.write("SET FOREIGN_KEY_CHECKS=0;\n")
+        
+        # Read every table from one snapshot, as mysqldump --single-transaction does
+        connection.start_transaction(consistent_snapshot=True, readonly=True)
+        
+        cursor = connection.cursor()
+        cursor.execute("SHOW FULL TABLES")
+        objects = {name: kind for name, kind in cursor.fetchall()}
+        if table_name:
+            if table_name not in objects:
+                raise Exception(f"Table {table_name} not found")
+            objects = {table_name: objects[table_name]}
+        cursor.execute(_DUMP_TRIGGERS_SQL, (database_name,))
+        triggers = [name for name, table in cursor.fetchall() if table in objects]
+        cursor.close()
+        tables = [name for name, kind in objects.items() if kind == 'BASE TABLE']
+        
+        for table in tables:
+            quoted = quote_identifier(table)
+            
+            cursor = connection.cursor()
+            cursor.execute(f"SHOW CREATE TABLE {quoted}")
+            create_sql = cursor.fetchone()[1]
+            cursor.close()
+            out.write(f"\nDROP TABLE IF EXISTS {quoted};\n{create_sql};\n")
+            
+            columns = BackupModel._dump_columns(connection, database_name, table)
+            column_list = ', '.join(quote_identifier(name) for name, _ in columns)
+            # The connector turns zero dates into None; read date types as text
+            # so '0000-00-00' survives instead of becoming NULL
+            select_list = ', '.join(
+                f"CAST({quote_identifier(name)} AS CHAR)" if data_type in _DATE_TYPES
+                else quote_identifier(name)
+                for name, data_type in columns)
+            
+            # Unbuffered cursor streams rows instead of loading the whole table
+            cursor = connection.cursor(buffered=False)
+            cursor.execute(f"SELECT {select_list} FROM {quoted}")
+            while True:
+                rows = cursor.fetchmany(INSERT_BATCH)
+                if not rows:
+                    break
+                values = ',\n'.join(
+                    '(' + ','.join(_sql_literal(v) for v in row) + ')' for row in rows)
+                out.write(f"INSERT INTO {quoted} ({column_list}) VALUES\n{values};\n")
+            cursor.close()
+        
+        # Triggers go after the data so they do not fire while it is loaded
+        cursor = connection.cursor()
+        for trigger in triggers:
+            cursor.execute(f"SHOW CREATE TRIGGER {quote_identifier(trigger)}")
+            create_sql = cursor.fetchone()[2]
+            out.write(f"\nDELIMITER ;;\n{create_sql};;\nDELIMITER ;\n")
+        
+        views = {}
+        for view in (name for name, kind in objects.items() if kind == 'VIEW'):
+            cursor.execute(f"SHOW CREATE VIEW {quote_identifier(view)}")
+            views[view] = cursor.fetchone()[1]
+        cursor.close()
+        for view, create_sql in _order_views(views):
+            quoted = quote_identifier(view)
+            out.write(f"\nDROP TABLE IF EXISTS {quoted};\nDROP VIEW IF EXISTS {quoted};\n{create_sql};\n")
+        
+        connection.rollback()  # End the read-only snapshot
+        out.write("\nSET FOREIGN_KEY_CHECKS=1;\n")
     
     @staticmethod
     def backup_database(database_name, table_name=None):
-        """Backup database or specific table using mysqldump"""
+        """Backup database or specific table to a gzip-compressed SQL file"""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         if table_name:
-            filename = f"{database_name}_{table_name}_{timestamp}.sql"
+            filename = f"{database_name}_{table_name}_{timestamp}.sql.gz"
         else:
-            filename = f"{database_name}_{timestamp}.sql"
+            filename = f"{database_name}_{timestamp}.sql.gz"
         
         filepath = os.path.join(Config.BACKUP_DIR, filename)
         
-        # Build mysqldump command
-        cmd = [
-            'mysqldump',
-            f'--host={Config.MYSQL_HOST}',
-            f'--user={Config.MYSQL_USER}',
-            f'--password={Config.MYSQL_PASSWORD}',
-            database_name
-        ]
-        
-        if table_name:
-            cmd.append(table_name)
-        
+        connection = None
         try:
-            with open(filepath, 'w') as f:
-                result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, 
-                                       text=True, check=True)
-            
-            file_size = os.path.getsize(filepath)
-            BackupModel.add_backup_entry(database_name, table_name, filename, file_size)
-            BackupModel.invalidate_stats_cache()  # Invalidate cache after backup
-            
-            return {
-                'filename': filename,
-                'size': file_size,
-                'path': filepath
-            }
-        except subprocess.CalledProcessError as e:
+            connection = DatabaseModel.get_connection(database_name)
+            with open(filepath, 'wb') as raw:
+                # Closing the gzip layer flushes it but leaves raw open
+                with gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=GZIP_LEVEL) as gz, \
+                        io.TextIOWrapper(gz, encoding='utf-8') as out:
+                    BackupModel._dump_stream(connection, database_name, table_name, out)
+                # Bytes written so far are the file size, no extra stat needed
+                file_size = raw.tell()
+        except Exception as e:
+            if connection:
+                # A dump that stopped midway can leave an unread result on the
+                # connection; drop the session so the pool reconnects it
+                connection.disconnect()
             if os.path.exists(filepath):
                 os.remove(filepath)
-            raise Exception(f"Backup failed: {e.stderr}")
+            raise Exception(f"Backup failed: {e}")
+        finally:
+            if connection:
+                # Undo the dump's time_zone/sql_mode before the pool reuses it
+                try:
+                    connection.reset_session()
+                except Error:
+                    pass
+                connection.close()
+        
+        BackupModel.add_backup_entry(database_name, table_name, filename, file_size)
+        BackupModel.invalidate_stats_cache()  # Invalidate cache after backup
+        
+        return {
+            'filename': filename,
+            'size': file_size,
+            'path': filepath
+        }
     
     @staticmethod
     def _load_restore_count():
-        """Load restore count from stats file"""
-        try:
-            if os.path.exists(Config.RESTORE_STATS_FILE):
-                with open(Config.RESTORE_STATS_FILE, 'r') as f:
-                    data = json.load(f)
-                    return int(data.get('total_restored', 0))
-        except Exception:
-            pass
-        return 0
+        """Return the restore count, reading the stats file only on first use"""
+        with _restore_lock:
+            if _restore_state['count'] is None:
+                count = 0
+                try:
+                    if os.path.exists(Config.RESTORE_STATS_FILE):
+                        data = _load_json(Config.RESTORE_STATS_FILE)
+                        count = int(data.get('total_restored', 0))
+                except Exception:
+                    pass
+                _restore_state['count'] = count
+            return _restore_state['count']
 
     @staticmethod
     def _save_restore_count(count):
         """Persist restore count to stats file"""
         try:
-            with open(Config.RESTORE_STATS_FILE, 'w') as f:
-                json.dump({'total_restored': int(count)}, f, indent=2)
+            _save_json(Config.RESTORE_STATS_FILE, {'total_restored': int(count)})
         except Exception:
             pass
 
+    @staticmethod
+    def _increment_restore_count():
+        """Count a restore in memory and schedule a write of the stats file"""
+        with _restore_lock:
+            _restore_state['count'] = BackupModel._load_restore_count() + 1
+            _restore_state['dirty'] = True
+            if _restore_state['timer'] is None:
+                timer = threading.Timer(RESTORE_FLUSH_DELAY, BackupModel._flush_restore_count)
+                timer.daemon = True
+                _restore_state['timer'] = timer
+                timer.start()
+
+    @staticmethod
+    def _flush_restore_count():
+        """Write the restore count to disk if it changed since the last write"""
+        with _restore_lock:
+            _restore_state['timer'] = None
+            if _restore_state['dirty']:
+                BackupModel._save_restore_count(_restore_state['count'])
+                _restore_state['dirty'] = False
+
     @staticmethod
     def restore_backup(filename, target_database=None):
         """Restore database from backup file"""
@@ -120,18 +512,12 @@ class BackupModel:
         if not os.path.exists(filepath):
             raise Exception("Backup file not found")
         
-        # Extract database name from filename if not provided
+        # Default to the backup's source database, recorded in the metadata;
+        # fall back to the filename prefix for backups made outside this app
         if not target_database:
-            target_database = filename.split('_')[0]
+            entry = BackupModel._refresh_metadata().get(filename)
+            target_database = entry['database'] if entry else filename.partition('_')[0]
         
-        cmd = [
-            'mysql',
-            f'--host={Config.MYSQL_HOST}',
-            f'--user={Config.MYSQL_USER}',
-            # Do not pass password via CLI, use env to avoid warnings and exposure
-            target_database
-        ]
-
         # Ensure target database exists (create if missing)
         try:
             # Will raise if cannot connect or cannot create
@@ -140,32 +526,39 @@ class BackupModel:
             # Ignore if it already exists or creation fails due to existence
             pass
         
-        env = os.environ.copy()
-        # Use MYSQL_PWD to avoid CLI warning and leaking credentials
-        env['MYSQL_PWD'] = str(Config.MYSQL_PASSWORD)
-        
+        opener = gzip.open if filename.endswith('.gz') else open
+        connection = None
         try:
-            with open(filepath, 'r') as f:
-                result = subprocess.run(
-                    cmd,
-                    stdin=f,
-                    stderr=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    text=True,
-                    check=True,
-                    env=env
-                )
+            connection = DatabaseModel.get_connection(target_database)
+            cursor = connection.cursor()
+            try:
+                with opener(filepath, 'rb') as f:
+                    for statement in _iter_statements(f):
+                        cursor.execute(statement)
+                        if cursor.with_rows:
+                            cursor.fetchall()
+                connection.commit()
+            finally:
+                cursor.close()
             # Increment persistent restore count
             try:
-                count = BackupModel._load_restore_count()
-                BackupModel._save_restore_count(count + 1)
+                BackupModel._increment_restore_count()
             except Exception:
                 # Non-fatal if stats update fails
                 pass
-            BackupModel.invalidate_stats_cache()  # Invalidate cache after restore
+            BackupModel.invalidate_table_count()  # Restore may have created tables
             return True
-        except subprocess.CalledProcessError as e:
-            raise Exception(f"Restore failed: {e.stderr or e.stdout}")
+        except (Error, OSError, EOFError) as e:
+            # OSError/EOFError cover unreadable files and corrupt gzip data
+            raise Exception(f"Restore failed: {e}")
+        finally:
+            if connection:
+                # The dump changes session variables; do not leak them into the pool
+                try:
+                    connection.reset_session()
+                except Error:
+                    pass
+                connection.close()
     
     @staticmethod
     def delete_backup(filename):
@@ -190,43 +583,29 @@ class BackupModel:
             return _stats_cache['data']
         
         # Cache expired or doesn't exist, compute fresh stats
-        metadata = BackupModel.get_metadata()
-        
-        databases_backed_up = set()
-        
-        for entry in metadata:
-            databases_backed_up.add(entry['database'])
+        total_backups, databases_backed_up = BackupModel._metadata_summary()
         
         # Load persistent restore count
         total_restored = BackupModel._load_restore_count()
 
-        # Compute total tables across non-system databases using optimized query
-        total_tables = 0
-        try:
-            connection = DatabaseModel.get_connection('information_schema')
-            cursor = connection.cursor()
-            
-            # Single optimized query to count all tables
-            system_dbs = "','".join(Config.SYSTEM_DATABASES)
-            query = f"""
-                SELECT COUNT(*) 
-                FROM information_schema.TABLES 
-                WHERE TABLE_SCHEMA NOT IN ('{system_dbs}')
-                AND TABLE_TYPE = 'BASE TABLE'
-            """
-            cursor.execute(query)
-            result = cursor.fetchone()
-            total_tables = result[0] if result else 0
-            
-            cursor.close()
-            connection.close()
-        except Exception as e:
-            print(f"Error counting tables: {e}")
-            total_tables = 0
+        # Total tables changes rarely and is slow to count, so it has its own TTL
+        total_tables = _table_count_cache['count']
+        if time.monotonic() - _table_count_cache['timestamp'] >= TABLE_COUNT_CACHE_DURATION:
+            try:
+                with DatabaseModel.with_conn('information_schema') as (connection, cursor):
+                    # Single optimized query to count all tables
+                    cursor.execute(_TOTAL_TABLES_SQL, SYSTEM_DATABASES)
+                    result = cursor.fetchone()
+                    total_tables = result[0] if result else 0
+                _table_count_cache['count'] = total_tables
+                _table_count_cache['timestamp'] = time.monotonic()
+            except Exception as e:
+                print(f"Error counting tables: {e}")
+                total_tables = 0
         
         stats = {
-            'total_backups': len(metadata),
-            'databases_backed_up': len(databases_backed_up),
+            'total_backups': total_backups,
+            'databases_backed_up': databases_backed_up,
             'total_restored': total_restored,
             'total_tables': total_tables
         }
@@ -243,3 +622,12 @@ class BackupModel:
         global _stats_cache
         _stats_cache['data'] = None
         _stats_cache['timestamp'] = 0
+    
+    @staticmethod
+    def invalidate_table_count():
+        """Force a fresh table count (call after tables are created or dropped)"""
+        _table_count_cache['timestamp'] = float('-inf')
+        BackupModel.invalidate_stats_cache()
+
+_migrate_legacy_metadata()
+atexit.register(BackupModel._flush_restore_count)
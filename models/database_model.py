@@ -2,57 +2,129 @@
 Database Model - Handles database operations
 """
 
-import mysql.connector
-from mysql.connector import Error
+import threading
+import time
+from contextlib import contextmanager
+from mysql.connector import Error, PoolError
+from mysql.connector.pooling import MySQLConnectionPool
 from config import Config
 
+# One connection pool shared by all databases, created lazily; each
+# checkout selects its database, so the number of open connections stays
+# at MYSQL_POOL_SIZE however many databases are browsed
+_pool = None
+_lock = threading.Lock()
+
+# DDL templates, filled with quoted identifiers
+_CREATE_TABLE_SQL = "CREATE TABLE {} ({})"
+
+def quote_identifier(name):
+    """Backtick-quote a database, table or column name"""
+    return '`' + name.replace('`', '``') + '`'
+
+# Query parameters and matching placeholders for "NOT IN (...)" filters on system databases
+SYSTEM_DATABASES = tuple(Config.SYSTEM_DATABASES)
+SYSTEM_DATABASES_PLACEHOLDERS = ', '.join(['%s'] * len(SYSTEM_DATABASES))
+
+# Let the server drop system schemas instead of filtering rows in Python
+_USER_DATABASES_SQL = (
+    "SELECT SCHEMA_NAME FROM information_schema.SCHEMATA "
+    f"WHERE SCHEMA_NAME NOT IN ({SYSTEM_DATABASES_PLACEHOLDERS}) "
+    "ORDER BY SCHEMA_NAME"
+)
+
 class DatabaseModel:
     
+    @staticmethod
+    def _get_pool():
+        """Return the shared connection pool, creating it on first use"""
+        global _pool
+        if _pool is None:
+            with _lock:
+                if _pool is None:
+                    _pool = MySQLConnectionPool(
+                        pool_name='dbms',
+                        pool_size=Config.MYSQL_POOL_SIZE,
+                        pool_reset_session=False,
+                        # Without a session reset, an implicit transaction would
+                        # outlive the request and pin a stale read snapshot
+                        autocommit=True,
+                        use_pure=Config.MYSQL_USE_PURE,
+                        host=Config.MYSQL_HOST,
+                        user=Config.MYSQL_USER,
+                        password=Config.MYSQL_PASSWORD,
+                        port=Config.MYSQL_PORT
+                    )
+        return _pool
+    
     @staticmethod
     def get_connection(database=None):
-        """Create and return MySQL connection"""
+        """Return a pooled MySQL connection (close() hands it back to the pool)"""
         try:
-            connection = mysql.connector.connect(
-                host=Config.MYSQL_HOST,
-                user=Config.MYSQL_USER,
-                password=Config.MYSQL_PASSWORD,
-                port=Config.MYSQL_PORT,
-                database=database
-            )
+            pool = DatabaseModel._get_pool()
+            # The pool raises instead of blocking when exhausted, so wait for a free slot
+            deadline = time.monotonic() + Config.MYSQL_POOL_TIMEOUT
+            while True:
+                try:
+                    connection = pool.get_connection()
+                    break
+                except PoolError:
+                    if time.monotonic() >= deadline:
+                        raise
+                    time.sleep(0.01)
+            
+            if database:
+                # One COM_INIT_DB round trip, much cheaper than a new connection
+                try:
+                    connection.cmd_init_db(database)
+                except Error:
+                    connection.close()
+                    raise
             return connection
         except Error as e:
             raise Exception(f"Database connection failed: {str(e)}")
     
     @staticmethod
-    def get_all_databases():
-        """Get list of all databases"""
-        connection = None
+    @contextmanager
+    def with_conn(database=None, **cursor_options):
+        """Yield a (connection, cursor) pair and always close both afterwards"""
+        connection = DatabaseModel.get_connection(database)
         try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            cursor.execute("SHOW DATABASES")
-            databases = [db[0] for db in cursor.fetchall() 
-                        if db[0] not in Config.SYSTEM_DATABASES]
-            return databases
+            cursor = connection.cursor(**cursor_options)
+        except Exception:
+            connection.close()
+            raise
+        try:
+            yield connection, cursor
         finally:
-            if connection and connection.is_connected():
+            try:
                 cursor.close()
-                connection.close()
+            except Error:
+                pass
+            connection.close()
+    
+    @staticmethod
+    def _tables_changed():
+        """Drop the cached table count used by the backup stats"""
+        # Imported here: backup_model depends on this module
+        from models.backup_model import BackupModel
+        BackupModel.invalidate_table_count()
+    
+    @staticmethod
+    def get_all_databases():
+        """Get list of all databases"""
+        with DatabaseModel.with_conn() as (connection, cursor):
+            cursor.execute(_USER_DATABASES_SQL, SYSTEM_DATABASES)
+            databases = [db[0] for db in cursor]
+            return databases
     
     @staticmethod
     def create_database(database_name):
         """Create a new database"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(f"CREATE DATABASE `{database_name}`")
+        with DatabaseModel.with_conn() as (connection, cursor):
+            cursor.execute(f"CREATE DATABASE {quote_identifier(database_name)}")
             connection.commit()
             return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def drop_database(database_name):
@@ -60,89 +132,52 @@ class DatabaseModel:
         if database_name in Config.SYSTEM_DATABASES:
             raise Exception("Cannot drop system database")
         
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(f"DROP DATABASE `{database_name}`")
+        with DatabaseModel.with_conn() as (connection, cursor):
+            cursor.execute(f"DROP DATABASE {quote_identifier(database_name)}")
             connection.commit()
-            return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+        DatabaseModel._tables_changed()
+        return True
     
     @staticmethod
     def get_tables(database_name):
         """Get all tables in a database"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection(database_name)
-            cursor = connection.cursor()
+        with DatabaseModel.with_conn(database_name) as (connection, cursor):
             cursor.execute("SHOW TABLES")
-            tables = [table[0] for table in cursor.fetchall()]
+            tables = [table[0] for table in cursor]
             return tables
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def create_table(database_name, table_name, columns):
         """Create a new table with columns"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection(database_name)
-            cursor = connection.cursor()
-            
-            column_defs = ', '.join([f"`{col['name']}` {col['type']}" for col in columns])
-            query = f"CREATE TABLE `{table_name}` ({column_defs})"
+        with DatabaseModel.with_conn(database_name) as (connection, cursor):
+            column_defs = ', '.join(f"{quote_identifier(col['name'])} {col['type']}" for col in columns)
+            query = _CREATE_TABLE_SQL.format(quote_identifier(table_name), column_defs)
             
             cursor.execute(query)
             connection.commit()
-            return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+        DatabaseModel._tables_changed()
+        return True
     
     @staticmethod
     def drop_table(database_name, table_name):
         """Drop a table"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection(database_name)
-            cursor = connection.cursor()
-            cursor.execute(f"DROP TABLE `{table_name}`")
+        with DatabaseModel.with_conn(database_name) as (connection, cursor):
+            cursor.execute(f"DROP TABLE {quote_identifier(table_name)}")
             connection.commit()
-            return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
+        DatabaseModel._tables_changed()
+        return True
     
     @staticmethod
     def get_table_structure(database_name, table_name):
         """Get table structure"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection(database_name)
-            cursor = connection.cursor()
-            cursor.execute(f"DESCRIBE `{table_name}`")
-            columns = cursor.fetchall()
-            
-            structure = []
-            for col in columns:
-                structure.append({
-                    'field': col[0],
-                    'type': col[1],
-                    'null': col[2],
-                    'key': col[3],
-                    'default': col[4],
-                    'extra': col[5]
-                })
+        with DatabaseModel.with_conn(database_name, dictionary=True) as (connection, cursor):
+            cursor.execute(f"DESCRIBE {quote_identifier(table_name)}")
+            structure = [{
+                'field': col['Field'],
+                'type': col['Type'],
+                'null': col['Null'],
+                'key': col['Key'],
+                'default': col['Default'],
+                'extra': col['Extra']
+            } for col in cursor]
             return structure
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
@@ -1,109 +1,89 @@
-from models.database_model import DatabaseModel
+from functools import lru_cache
+from models.database_model import DatabaseModel, quote_identifier
+
+# Privilege names are SQL keywords and cannot be bound as parameters, so
+# only names that MySQL accepts at database level (ON db.*) are let through
+_DATABASE_PRIVILEGES = frozenset([
+    'ALL', 'ALL PRIVILEGES', 'ALTER', 'ALTER ROUTINE', 'CREATE', 'CREATE ROUTINE',
+    'CREATE TEMPORARY TABLES', 'CREATE VIEW', 'DELETE', 'DROP', 'EVENT', 'EXECUTE',
+    'GRANT OPTION', 'INDEX', 'INSERT', 'LOCK TABLES', 'REFERENCES', 'SELECT',
+    'SHOW VIEW', 'TRIGGER', 'UPDATE', 'USAGE',
+])
+
+def _privilege_list(privileges):
+    """Validate privilege names and join them for a GRANT/REVOKE statement"""
+    names = []
+    for privilege in privileges:
+        name = ' '.join(privilege.upper().split())
+        if name not in _DATABASE_PRIVILEGES:
+            raise ValueError(f"Invalid privilege: {privilege}")
+        names.append(name)
+    return ', '.join(names)
+
+@lru_cache(maxsize=512)
+def _grant_sql(privileges, database):
+    """GRANT template for a (privileges, database) pair; user and host are bound"""
+    return f"GRANT {_privilege_list(privileges)} ON {quote_identifier(database)}.* TO %s@%s"
+
+@lru_cache(maxsize=512)
+def _revoke_sql(privileges, database):
+    """REVOKE template for a (privileges, database) pair; user and host are bound"""
+    return f"REVOKE {_privilege_list(privileges)} ON {quote_identifier(database)}.* FROM %s@%s"
 
 class UserModel:
     
     @staticmethod
     def get_all_users():
         """Get all MySQL users (excluding system users)"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection('mysql')
-            cursor = connection.cursor()
-            cursor.execute("SELECT User, Host FROM user WHERE User != '' AND User NOT IN ('mysql.sys', 'mysql.session', 'mysql.infoschema')")
-            users = [{'username': row[0], 'host': row[1]} for row in cursor.fetchall()]
+        with DatabaseModel.with_conn('mysql', dictionary=True) as (connection, cursor):
+            # Alias the columns so the rows come back in the API's shape
+            cursor.execute("SELECT User AS username, Host AS host FROM user WHERE User != '' AND User NOT IN ('mysql.sys', 'mysql.session', 'mysql.infoschema')")
+            users = cursor.fetchall()
             return users
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def create_user(username, password=None, host='localhost'):
         """Create a new MySQL user"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            
+        with DatabaseModel.with_conn() as (connection, cursor):
             # Create user with or without password
             if password:
-                cursor.execute(f"CREATE USER '{username}'@'{host}' IDENTIFIED BY '{password}'")
+                cursor.execute("CREATE USER %s@%s IDENTIFIED BY %s", (username, host, password))
             else:
-                cursor.execute(f"CREATE USER '{username}'@'{host}'")
+                cursor.execute("CREATE USER %s@%s", (username, host))
             
             connection.commit()
             return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def drop_user(username, host='localhost'):
         """Drop a MySQL user"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(f"DROP USER '{username}'@'{host}'")
+        with DatabaseModel.with_conn() as (connection, cursor):
+            cursor.execute("DROP USER %s@%s", (username, host))
             connection.commit()
             return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def get_user_privileges(username, host='localhost'):
         """Get privileges for a user"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            cursor.execute(f"SHOW GRANTS FOR '{username}'@'{host}'")
+        with DatabaseModel.with_conn() as (connection, cursor):
+            cursor.execute("SHOW GRANTS FOR %s@%s", (username, host))
             grants = [row[0] for row in cursor.fetchall()]
             return grants
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def grant_privileges(username, host, database, privileges):
         """Grant privileges to user on database"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            
-            priv_str = ', '.join(privileges)
-            query = f"GRANT {priv_str} ON `{database}`.* TO '{username}'@'{host}'"
-            
-            cursor.execute(query)
-            cursor.execute("FLUSH PRIVILEGES")
+        with DatabaseModel.with_conn() as (connection, cursor):
+            # GRANT reloads the grant tables itself, no FLUSH PRIVILEGES needed
+            cursor.execute(_grant_sql(tuple(privileges), database), (username, host))
             connection.commit()
             return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
     
     @staticmethod
     def revoke_privileges(username, host, database, privileges):
         """Revoke privileges from user on database"""
-        connection = None
-        try:
-            connection = DatabaseModel.get_connection()
-            cursor = connection.cursor()
-            
-            priv_str = ', '.join(privileges)
-            query = f"REVOKE {priv_str} ON `{database}`.* FROM '{username}'@'{host}'"
-            
-            cursor.execute(query)
-            cursor.execute("FLUSH PRIVILEGES")
+        with DatabaseModel.with_conn() as (connection, cursor):
+            # REVOKE reloads the grant tables itself, no FLUSH PRIVILEGES needed
+            cursor.execute(_revoke_sql(tuple(privileges), database), (username, host))
             connection.commit()
             return True
-        finally:
-            if connection and connection.is_connected():
-                cursor.close()
-                connection.close()
@@ -7,7 +7,8 @@ const API_BASE = 'http://localhost:5000/api';
 // Helper to handle fetch with better error handling
 async function apiFetch(url, options = {}) {
     try {
-        const response = await fetch(url, options);
+        // Always revalidate: read endpoints send ETags, so unchanged data costs a 304
+        const response = await fetch(url, { cache: 'no-cache', ...options });
         return await response.json();
     } catch (error) {
         console.error('API Fetch Error:', error);
@@ -15,6 +16,20 @@ async function apiFetch(url, options = {}) {
     }
 }
 
+// Poll a background job until it finishes; resolves with its final response
+async function waitForJob(jobId, interval = 1000) {
+    while (true) {
+        const data = await api.backups.getJob(jobId);
+        if (!data.success || data.done) {
+            return data;
+        }
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+}
+
+// Backup and restore answer with a job id; wait for the job's outcome
+const resolveJob = (data) => data.job_id ? waitForJob(data.job_id) : data;
+
 const api = {
     // Database endpoints
     databases: {
@@ -48,12 +63,13 @@ const api = {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ database, table })
-        }),
+        }).then(resolveJob),
         restore: (filename, target_database = null) => apiFetch(`${API_BASE}/backups/restore`, {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ filename, target_database })
-        }),
+        }).then(resolveJob),
+        getJob: (jobId) => apiFetch(`${API_BASE}/backups/jobs/${jobId}`),
         delete: (filename) => apiFetch(`${API_BASE}/backups/${filename}`, {
             method: 'DELETE'
         })
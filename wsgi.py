@@ -0,0 +1,25 @@
+"""
+WSGI entry point for running the API under gunicorn with gevent workers:
+
+    pip install -r requirements.txt  # includes msgspec, gunicorn and gevent
+    gunicorn -k gevent -w 1 -b 0.0.0.0:5000 --worker-connections 1000 wsgi:application
+
+gevent must patch the standard library before anything else is imported,
+so that sockets, sleeps and threads yield to other requests instead of
+blocking the worker. The pure-Python MySQL driver is selected because the
+C extension does its network I/O outside Python and would stall the loop.
+
+The connection pool is per process and capped at MYSQL_POOL_SIZE
+connections; requests beyond that wait (up to MYSQL_POOL_TIMEOUT) for a
+connection to be returned rather than failing. Backup/restore job ids are
+also tracked per process, so scale with greenlets (--worker-connections)
+and keep a single worker (-w 1) unless requests are routed sticky.
+"""
+
+from gevent import monkey
+monkey.patch_all()
+
+import os
+os.environ.setdefault('MYSQL_USE_PURE', '1')
+
+from app import app as application